@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+
+# Memory benchmark for a route_uiuc_v2.py full refresh (--ignore_dates) at scale
+#
+# Runs the real HandleLoad.__init__() and run() from one or more router files against a synthetic
+# source database and warehouse of N resources. Django, the resource_v2 models, psycopg2 and
+# processing_status are replaced by in-memory stubs, so the numbers are the router's own record
+# layer and not Django or libpq overhead. Each router and N is run in its own process.
+#
+# Compare against the router before the compact record layer with:
+#   git show e3bf484^:bin/route_uiuc_v2.py > /tmp/route_uiuc_v2_baseline.py
+#   bin/benchmark_uiuc_v2_memory.py -n 100000 1000000 --router bin/route_uiuc_v2.py /tmp/route_uiuc_v2_baseline.py
+import os
+import sys
+import argparse
+import importlib.util
+import itertools
+import json
+import resource
+import subprocess
+import tempfile
+import time
+import types
+from datetime import datetime, timedelta
+
+Affiliation = 'uiuc.edu'
+TIME_FORMAT = '%Y-%m-%dT%H:%M:%S%z'
+PROVIDERS = 500
+TAGS = 200
+
+# Source tables and columns that route_uiuc_v2.py reads, resources_tags has two rows per resource,
+# associated_resources one per ten resources, curated_guide one per thousand and curated_guide_resource one per ten
+COLUMNS = {
+    'resource': ['id', 'resource_name', 'resource_type', 'resource_group', 'provider', 'record_status',
+                 'short_description', 'resource_description', 'topics',
+                 'last_updated', 'start_date_time', 'end_date_time'],
+    'provider': ['id', 'name'],
+    'tag': ['id', 'label'],
+    'resources_tags': ['id', 'resource_id', 'tag_id'],
+    'associated_resources': ['id', 'resource_id', 'associated_resource_id'],
+    'curated_guide': ['id', 'title', 'created_at', 'updated_at'],
+    'curated_guide_resource': ['id', 'curated_guide_id', 'resource_id'],
+}
+
+def Source_Rows(table, count, description_size):
+    # Yields fresh tuples like a database cursor, every value is a distinct object
+    base = datetime(2020, 1, 1)
+    if table == 'resource':
+        for id in range(1, count + 1):
+            yield (id, 'Resource name {}'.format(id), 'Online Service', 'Software', id % PROVIDERS + 1, 1,
+                   'Short description {} '.format(id).ljust(description_size // 4, 'x'),
+                   'Description {} '.format(id).ljust(description_size, 'x'),
+                   'Topic {}, Science'.format(id % 100),
+                   base + timedelta(seconds=id), base, None)
+    elif table == 'provider':
+        for id in range(1, PROVIDERS + 1):
+            yield (id, 'Provider {}'.format(id))
+    elif table == 'tag':
+        for id in range(1, TAGS + 1):
+            yield (id, 'Tag {}'.format(id))
+    elif table == 'resources_tags':
+        for id in range(1, 2 * count + 1):
+            yield (id, (id + 1) // 2, id % TAGS + 1)
+    elif table == 'associated_resources':
+        for id in range(1, count // 10 + 1):
+            yield (id, id * 10, id * 10 - 1)
+    elif table == 'curated_guide':
+        for id in range(1, count // 1000 + 2):
+            yield (id, 'Guide {}'.format(id), base, base + timedelta(seconds=id))
+    elif table == 'curated_guide_resource':
+        for id in range(1, count // 10 + 1):
+            yield (id, id % (count // 1000 + 1) + 1, id * 10)
+
+def Source_Dicts(table, count, description_size):
+    for row in Source_Rows(table, count, description_size):
+        item = dict(zip(COLUMNS[table], row))
+        for col in item:
+            if isinstance(item[col], datetime):
+                item[col] = item[col].strftime(TIME_FORMAT)
+        yield item
+
+class Stub_Column(object):
+    def __init__(self, name):
+        self.name = name
+
+class Stub_Cursor(object):
+    # An unnamed cursor holds the whole result once execute() returns, like libpq.
+    # A named cursor fetches itersize rows at a time and sets description after the first fetch.
+    def __init__(self, conn, name=None):
+        self.conn = conn
+        self.name = name
+        self.itersize = 2000
+        self.description = None
+        self.rows = None
+
+    def execute(self, sql):
+        self.table = sql.split()[-1]
+        self.rows = Source_Rows(self.table, self.conn.count, self.conn.description_size)
+        if self.name is None:
+            self.description = [Stub_Column(col) for col in COLUMNS[self.table]]
+            self.rows = list(self.rows)
+
+    def fetchall(self):
+        return(list(self.rows))
+
+    def __iter__(self):
+        if self.name is None:
+            return(iter(self.rows))
+        return(self.Fetch_Batches())
+
+    def Fetch_Batches(self):
+        while True:
+            batch = list(itertools.islice(self.rows, self.itersize))
+            if not batch:
+                return
+            self.description = [Stub_Column(col) for col in COLUMNS[self.table]]
+            for row in batch:
+                yield row
+
+    def close(self):
+        self.rows = None
+
+class Stub_Connection(object):
+    def __init__(self, count, description_size):
+        self.count = count
+        self.description_size = description_size
+
+    def cursor(self, name=None):
+        return(Stub_Cursor(self, name))
+
+    def close(self):
+        pass
+
+class Stub_State(object):
+    def __init__(self):
+        self.db = 'default'
+        self.adding = False
+        self.fields_cache = {}
+
+class Stub_Model(object):
+    # Like a Django model instance, fields and _state live in the instance __dict__
+    def __init__(self, **kwargs):
+        self._state = Stub_State()
+        self.__dict__.update(kwargs)
+
+    def save(self):
+        pass
+
+    def delete(self):
+        pass
+
+class Stub_QuerySet(object):
+    # Iterating a queryset caches every instance, values_list().iterator() streams from the database
+    def __init__(self, model, fields=None, flat=False):
+        self.model = model
+        self.fields = fields
+        self.flat = flat
+
+    def filter(self, **kwargs):
+        return(self)
+
+    def all(self):
+        return(self)
+
+    def values_list(self, *fields, flat=False):
+        return(Stub_QuerySet(self.model, fields, flat))
+
+    def get(self, pk):
+        return(self.model(ID=pk))
+
+    def __iter__(self):
+        return(iter(list(self.iterator())))
+
+    def iterator(self):
+        for row in self.model.Warehouse_Rows():
+            if self.fields is None:
+                row.pop('EntityJSON__last_updated', None)   # Only a values_list() key, not a model field
+                if 'EntityJSON' in row:
+                    row['EntityJSON'] = json.loads(row['EntityJSON'])
+                yield self.model(**row)
+            elif self.flat:
+                yield row[self.fields[0]]
+            else:
+                yield tuple(row[field] for field in self.fields)
+
+class Stub_Manager(object):
+    def __init__(self, model):
+        self.model = model
+
+    def filter(self, **kwargs):
+        return(Stub_QuerySet(self.model))
+
+    def all(self):
+        return(Stub_QuerySet(self.model))
+
+    def get(self, pk):
+        return(self.model(ID=pk))
+
+def Install_Stubs(count, description_size):
+    # The warehouse already holds the same N resources, so a full refresh updates every one of them
+    def Resource_Rows():
+        for item in Source_Dicts('resource', count, description_size):
+            yield {'ID': 'urn:glue2:GlobalResource:{}.{}'.format(item['id'], Affiliation),
+                   'Name': item['resource_name'], 'CreationTime': datetime.now(), 'Validity': None,
+                   'EntityJSON': json.dumps(item), 'EntityJSON__last_updated': item['last_updated'],
+                   'Affiliation': Affiliation,
+                   'ProviderID': 'urn:glue2:GlobalResourceProvider:{}.{}'.format(item['provider'], Affiliation),
+                   'ResourceGroup': item['resource_group'], 'Type': item['resource_type'],
+                   'ShortDescription': item['short_description'], 'Description': item['resource_description'],
+                   'QualityLevel': 'production', 'LocalID': str(item['id']), 'Topics': item['topics'],
+                   'Keywords': None, 'Associations': None}
+
+    def Named_Rows(table, urntype, name):
+        def rows():
+            for item in Source_Dicts(table, count, description_size):
+                yield {'ID': 'urn:glue2:{}:{}.{}'.format(urntype, item['id'], Affiliation),
+                       'Name': item[name], 'CreationTime': datetime.now(), 'Validity': None,
+                       'EntityJSON': json.dumps(item), 'Affiliation': Affiliation, 'LocalID': str(item['id'])}
+        return(rows)
+
+    def Guide_Resource_Rows():
+        for item in Source_Dicts('curated_guide_resource', count, description_size):
+            yield {'ID': 'urn:glue2:GlobalGuideResource:{0}.{2}:{1}.{2}'.format(item['curated_guide_id'], item['resource_id'], Affiliation),
+                   'CuratedGuideID': 'urn:glue2:GlobalGuide:{}.{}'.format(item['curated_guide_id'], Affiliation),
+                   'ResourceID': 'urn:glue2:GlobalResource:{}.{}'.format(item['resource_id'], Affiliation)}
+
+    models = types.ModuleType('resource_v2.models')
+    models.__all__ = []
+    for (name, rows) in [('ResourceV2', Resource_Rows),
+                         ('ResourceV2Provider', Named_Rows('provider', 'GlobalResourceProvider', 'name')),
+                         ('ResourceV2Guide', Named_Rows('curated_guide', 'GlobalGuide', 'title')),
+                         ('ResourceV2GuideResource', Guide_Resource_Rows)]:
+        model = type(name, (Stub_Model,), {'Warehouse_Rows': staticmethod(rows)})
+        model.objects = Stub_Manager(model)
+        setattr(models, name, model)
+        models.__all__.append(name)
+
+    modules = {name: types.ModuleType(name) for name in ['django', 'django.db', 'django.utils', 'django.utils.dateparse',
+                                                         'resource_v2', 'processing_status', 'processing_status.process',
+                                                         'psycopg2']}
+    modules['resource_v2.models'] = models
+    modules['django'].setup = lambda: None
+    modules['django.db'].DataError = type('DataError', (Exception,), {})
+    modules['django.db'].IntegrityError = type('IntegrityError', (Exception,), {})
+    modules['django.utils.dateparse'].parse_datetime = lambda value: None
+    modules['processing_status.process'].ProcessingActivity = type('ProcessingActivity', (object,), \
+        {'__init__': lambda self, *args: None, 'FinishActivity': lambda self, rc, msg: None})
+    modules['psycopg2'].Error = type('Error', (Exception,), {})
+    modules['psycopg2'].connect = lambda conn_string: Stub_Connection(count, description_size)
+    sys.modules.update(modules)
+
+def Current_RSS():
+    # Resident set size in KB, Linux only
+    with open('/proc/self/statm', 'r') as file:
+        pages = int(file.read().split()[1])
+    return(pages * os.sysconf('SC_PAGE_SIZE') // 1024)
+
+def Run_Router(router, count, description_size):
+    Install_Stubs(count, description_size)
+    spec = importlib.util.spec_from_file_location('route_uiuc_v2', router)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    workdir = tempfile.mkdtemp()
+    config = os.path.join(workdir, 'route_uiuc_v2.conf')
+    with open(config, 'w') as file:
+        json.dump({'LOG_FILE': os.path.join(workdir, 'route_uiuc_v2.log'),
+                   'SOURCE_DBUSER': 'benchmark', 'SOURCE_DBPASS': ''}, file)
+    sys.argv = [router, '-s', 'postgresql://localhost:5432/uiucBenchmark', '-d', 'warehouse',
+                '--ignore_dates', '-l', 'warning', '-c', config]
+    router = module.HandleLoad()
+
+    before = Current_RSS()
+    start = time.time()
+    router.run()
+    seconds = time.time() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return({'peak_kb': peak - before, 'seconds': seconds, 'updates': router.stats['Resource.Update']})
+
+def main():
+    default_router = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'route_uiuc_v2.py')
+    parser = argparse.ArgumentParser(description='Measure route_uiuc_v2 memory on a synthetic full refresh')
+    parser.add_argument('-n', '--count', action='store', type=int, nargs='+', default=[100000, 1000000], \
+                        help='Number of resources (default=100000 1000000)')
+    parser.add_argument('--router', action='store', nargs='+', default=[default_router], \
+                        help='Router files to measure (default={})'.format(default_router))
+    parser.add_argument('--description-size', action='store', type=int, default=200, \
+                        help='Characters in each resource_description (default=200)')
+    parser.add_argument('--memory-limit', action='store', type=int, \
+                        help='Address space limit in MB for each run, reported as MemoryError when exceeded')
+    parser.add_argument('--child', action='store_true', \
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        if args.memory_limit:
+            limit = args.memory_limit * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        try:
+            result = Run_Router(args.router[0], args.count[0], args.description_size)
+        except MemoryError:
+            result = {'error': 'MemoryError'}
+        sys.stdout.write(json.dumps(result) + '\n')
+        return
+
+    print('{:>9} {:<36} {:>10} {:>9} {:>9}'.format('N', 'router', 'peak MB', 'seconds', 'updates'))
+    for count in args.count:
+        for router in args.router:
+            command = [sys.executable, os.path.abspath(__file__), '--child', '-n', str(count), '--router', router,
+                       '--description-size', str(args.description_size)]
+            if args.memory_limit:
+                command += ['--memory-limit', str(args.memory_limit)]
+            result = json.loads(subprocess.check_output(command).decode().splitlines()[-1])
+            if 'error' in result:
+                print('{:>9} {:<36} {:>10}'.format(count, router, result['error']))
+            else:
+                print('{:>9} {:<36} {:>10.1f} {:>9.1f} {:>9}'.format(count, router, result['peak_kb'] / 1024,
+                                                                      result['seconds'], result['updates']))
+            sys.stdout.flush()
+
+if __name__ == '__main__':
+    main()